@@ -1,7 +1,7 @@
 import numpy as np
 from emepy.fd import MSEMpy, ModeSolver, MSTidy3D
 from emepy.models import Layer
-from emepy.tools import vertices_to_n
+from emepy.tools import vertices_to_n, pixel_grid
 from copy import deepcopy
 
 """
@@ -249,37 +249,49 @@ class DynamicRect2D(DynamicPolygon):
         )
         self.grid_z = np.linspace(0, length, mesh_z)
 
-        # Set left side static vertices
-        x = [-input_width / 2, input_width / 2]
-        z = [0, 0]
-        self.static_vertices_left = list(zip(x, z))
-
-        # Set top dynamic vertices
-        x = np.linspace(
-            input_width / 2, output_width / 2, num_params
-        ).tolist()  # [width / 2] * num_params
-        z = np.linspace(0, length, num_params + 2)[1:-1].tolist()
-        dynamic_vertices_top = list(zip(x, z))
-
-        # Set right side static vertices
-        x = [output_width / 2, -output_width / 2]
-        z = [length, length]
-        self.static_vertices_right = list(zip(x, z))
-
-        # Set bottom dynamic vertices
-        x = np.linspace(
-            -output_width / 2, -input_width / 2, num_params
-        ).tolist()  # [-width / 2] * num_params
-        z = np.linspace(0, length, num_params + 2)[1:-1][::-1].tolist()
-        dynamic_vertices_bottom = list(zip(x, z))
+        # Set static vertices
+        self.static_vertices_left = [(-input_width / 2, 0), (input_width / 2, 0)]
+        self.static_vertices_right = [
+            (output_width / 2, length),
+            (-output_width / 2, length),
+        ]
+
+        # Set top and bottom dynamic vertices, sharing the interior z positions
+        z = np.linspace(0, length, num_params + 2)[1:-1]
+        dynamic_vertices_top = np.column_stack(
+            [np.linspace(input_width / 2, output_width / 2, num_params), z]
+        )
+        dynamic_vertices_bottom = np.column_stack(
+            [np.linspace(-output_width / 2, -input_width / 2, num_params), z[::-1]]
+        )
 
         # Establish design
         design = (
-            dynamic_vertices_top[:]
+            dynamic_vertices_top
+            if symmetry
+            else np.concatenate([dynamic_vertices_top, dynamic_vertices_bottom])
+        ).ravel()
+
+        # Fix the vertex layout so only the design rows need to be scattered for each new design
+        self._vertices = np.concatenate(
+            [
+                self.static_vertices_left,
+                dynamic_vertices_top,
+                self.static_vertices_right,
+                dynamic_vertices_bottom,
+            ]
+        )
+        self._dynamic_rows = np.r_[
+            2 : 2 + num_params, 4 + num_params : 4 + 2 * num_params
+        ]
+        self._design_rows = (
+            np.r_[np.arange(num_params), np.arange(num_params)[::-1]]
             if symmetry
-            else dynamic_vertices_top + dynamic_vertices_bottom
+            else np.arange(2 * num_params)
         )
-        design = [i for j in design for i in j]
+        self._design_signs = np.ones((2 * num_params, 2))
+        if symmetry:
+            self._design_signs[num_params:, 0] = -1
 
         # Fix params
         self.params.x = (
@@ -294,70 +306,93 @@ class DynamicRect2D(DynamicPolygon):
         )
         self.params.mesh -= 1
 
+        # Cache the design independent pixel grid and the index maps of recent designs
+        self._start = self._mirror_start(self.grid_x)
+        self._grid = pixel_grid(self.grid_x[self._start :], self.grid_z)
+        self._n_cache = {}
+
         # Set design
         self.set_design(design)
 
     def set_design(self, design: list):
         """Sets the design region parameters"""
-        self.design = design
+        self.design = np.asarray(design, dtype=float)
         self.set_layers()
 
     def get_n(self, grid_x, grid_y, grid_z):
         """Will form the refractive index map given the current parameters"""
-        # Create vertices
-        vertices = []
+        # Reuse the cached grid and index maps when called on the geometry's own grid
+        if grid_x is self.grid_x and grid_z is self.grid_z:
+            key = (
+                self.design.tobytes(),
+                self.subpixel,
+                self.params.core_index,
+                self.params.cladding_index,
+            )
+            if key in self._n_cache:
+                # Move the hit to the end so the least recently used map is evicted
+                self._n_cache[key] = self._n_cache.pop(key)
+            else:
+                if len(self._n_cache) >= 32:
+                    self._n_cache.pop(next(iter(self._n_cache)))
+                self._n_cache[key] = self.get_polygon_n(grid_x, grid_z, self._grid)
+                self._n_cache[key].flags.writeable = False
+
+            # Callers get their own copy so the cached map cannot be modified
+            polygon = self._n_cache[key].copy()
+        else:
+            polygon = self.get_polygon_n(grid_x, grid_z)
 
-        # Add static left vertices
-        vertices += self.static_vertices_left
+        # Extend in 3D by broadcasting the polygon across the core thickness
+        if grid_y is not None:
+            y = 0.5 * (grid_y[1:] + grid_y[:-1])
+            core = np.abs(y) < self.thickness / 2
+            return np.where(
+                core[None, :, None], polygon[:, None, :], self.params.cladding_index
+            )
 
-        # Add top design
-        top = self.design if self.symmetry else self.design[: len(self.design) // 2]
-        vertices += [(x, z) for x, z in zip(top[:-1:2], top[1::2])]
+        # Return polygon
+        return polygon
 
-        # Add static right vertices
-        vertices += self.static_vertices_right
+    def get_polygon_n(self, grid_x, grid_z, grid: tuple = None):
+        """Will form the 2D refractive index map of the polygon given the current parameters"""
+        # Accept any sequence for the grid so it can be mirrored and sliced as an array
+        grid_x = np.asarray(grid_x)
 
-        # Add bottom design
-        bottom = self.design if self.symmetry else self.design[len(self.design) // 2 :]
-        if self.symmetry:
-            vertices += [
-                (-x, z) for x, z in list(zip(bottom[:-1:2], bottom[1::2]))[::-1]
-            ]
-        else:
-            vertices += [(x, z) for x, z in list(zip(bottom[:-1:2], bottom[1::2]))]
+        # Scatter the (x, z) design vertices into the vertex layout
+        design = self.design.reshape(-1, 2)
+        self._vertices[self._dynamic_rows] = (
+            design[self._design_rows] * self._design_signs
+        )
 
         # Form polygon
-        polygon = vertices_to_n(
-            vertices,
-            grid_x,
+        start = self._start if grid_x is self.grid_x else self._mirror_start(grid_x)
+        n = vertices_to_n(
+            self._vertices,
+            grid_x[start:],
             grid_z,
             self.subpixel,
             self.params.core_index,
             self.params.cladding_index,
+            grid,
         )
-
-        # Extend in 3D
-        if grid_y is not None:
-            polygon = np.stack([polygon] * (len(grid_y) - 1), axis=1)
-            x, y, z = (
-                0.5 * (grid_x[1:] + grid_x[:-1]),
-                0.5 * (grid_y[1:] + grid_y[:-1]),
-                0.5 * (grid_z[1:] + grid_z[:-1]),
-            )
-            x_, y_, z_ = np.meshgrid(x, y, z, indexing="ij")
-            n = np.ones(x_.shape) * self.params.cladding_index
-            n = np.where(np.abs(y_) < self.thickness / 2, polygon, n)
+        if not start:
             return n
 
-        # Return polygon
-        return polygon
+        # Mirror onto the negative x pixels, skipping the center pixel if it straddles x=0
+        return np.concatenate([n[(len(grid_x) - 1) % 2 :][::-1], n])
+
+    def _mirror_start(self, grid_x) -> int:
+        """Returns the index of grid_x from which the index map must be computed, nonzero only when a symmetric design is on a symmetric grid"""
+        if self.symmetry and np.allclose(grid_x, -grid_x[::-1]):
+            return (len(grid_x) - 1) // 2
+        return 0
 
     def set_layers(self):
         """Creates the layers needed for the geometry"""
 
         # Get n
         n = self.get_n(self.grid_x, None, self.grid_z)
-        from matplotlib import pyplot as plt
 
         # Iterate through n and create layers
         self.layers = []
@@ -416,19 +451,18 @@ class WaveguideChannels(Geometry):
         exclude_indices: list = [],
     ) -> None:
 
-        # Create n
+        # Create channel edges
         starting_center = -0.5 * (num_channels - 1) * (gap + width)
-        n_output = np.ones(params.mesh) * params.cladding_index
-        for out in range(num_channels):
-            if out not in exclude_indices:
-                center = starting_center + out * (gap + width)
-                left_edge = center - 0.5 * width
-                right_edge = center + 0.5 * width
-                n_output = np.where(
-                    (left_edge <= params.x) * (params.x <= right_edge),
-                    params.core_index,
-                    n_output,
-                )
+        channels = np.setdiff1d(np.arange(num_channels), exclude_indices)
+        centers = starting_center + channels * (gap + width)
+        left_edges, right_edges = (centers - 0.5 * width, centers + 0.5 * width)
+
+        # Create n
+        x = np.asarray(params.x)
+        in_core = (
+            (left_edges[:, None] <= x[None, :]) & (x[None, :] <= right_edges[:, None])
+        ).any(axis=0)
+        n_output = np.where(in_core, params.core_index, params.cladding_index)
 
         # Create modesolver
         output_channel = params.get_solver_index(thickness, num_modes, n_output)
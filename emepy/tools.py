@@ -3,78 +3,168 @@ import os
 import EMpy_gpu
 import collections
 from emepy.materials import *
-from typing import Callable
-from shapely.geometry import Polygon, Point
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon
 
 
 def polygon_to_n_2D(
-    polygon: "Polygon", x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4
+    polygon: "Polygon", x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4, grid: tuple = None
+) -> "np.ndarray":
+    import shapely
+
+    # Create a polygon for every pixel unless a precomputed grid is provided
+    bounds, pixels, tree = grid if grid is not None else pixel_grid(x, y)
+
+    xlower, xupper, ylower, yupper = bounds
+    overlapping_area = np.zeros(pixels.shape)
+
+    # Pixels crossed by the boundary of the polygon are clipped against it
+    edge = tree.query(polygon.boundary, predicate="intersects")
+    overlapping_area.flat[edge] = shapely.area(shapely.intersection(pixels.flat[edge], polygon))
+
+    # The remaining pixels within the bounding box are entirely inside or outside, so testing their centers is enough
+    interior = np.setdiff1d(tree.query(polygon), edge)
+    xc = np.broadcast_to(0.5 * (xlower + xupper), pixels.shape).flat[interior]
+    yc = np.broadcast_to(0.5 * (ylower + yupper), pixels.shape).flat[interior]
+    interior = interior[shapely.contains_xy(polygon, xc, yc)]
+    overlapping_area.flat[interior] = np.broadcast_to((xupper - xlower) * (yupper - ylower), pixels.shape).flat[interior]
+
+    return _overlap_to_n(overlapping_area, *bounds, subpixel, core_index, cladding_index)
+
+
+def vertices_to_n(
+    vertices: list, x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4, grid: tuple = None
 ) -> "np.ndarray":
-    # Create grid
-    xx, yy = np.meshgrid(x, y)
-    n = np.zeros(xx.shape)[:-1, :-1].T
-
-    # Apply subpixel
-    xlower, xupper = (x[:-1], x[1:])
-    zlower, zupper = (y[:-1], y[1:])
-    for i, xp in enumerate(zip(xlower, xupper)):
-        for j, zp in enumerate(zip(zlower, zupper)):
-
-            # Upper and lower points
-            xl, xu = xp
-            zl, zu = zp
-            total_area = (xu - xl) * (zu - zl)
-
-            # Create polygon of the pixel
-            pixel_poly = Polygon([(xl, zl), (xl, zu), (xu, zu), (xu, zl)])
-
-            # Get overlapping area
-            overlapping_area = 0
-            if pixel_poly.intersects(polygon):
-                overlapping_area = pixel_poly.intersection(polygon).area
-
-            # Calculate effective index
-            if subpixel:
-                n[i, j] = (
-                    overlapping_area / total_area * core_index + (1 - overlapping_area / total_area) * cladding_index
-                )
-            elif overlapping_area:
-                n[i, j] = core_index
-            else:
-                n[i, j] = cladding_index
-
-    return n
-
-
-def vertices_to_n(vertices: list, x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4) -> "np.ndarray":
     """
     Takes vertices of a polygon and maps it to a grid using or not using subpixel smoothing
     """
 
+    from shapely.geometry import Polygon
+
     polygon = Polygon(vertices)
-    return polygon_to_n_2D(polygon, x, y, subpixel, core_index, cladding_index)
+    return polygon_to_n_2D(polygon, x, y, subpixel, core_index, cladding_index, grid)
+
+
+def pixel_grid(x: list, y: list) -> tuple:
+    """
+    Returns the pixel bounds, pixel polygons and spatial index of a grid so they can be reused across calls to polygon_to_n_2D
+    """
+
+    import shapely
+
+    xlower, xupper, ylower, yupper = _pixel_bounds(x, y)
+    pixels = shapely.box(*np.broadcast_arrays(xlower, ylower, xupper, yupper))
+    return (xlower, xupper, ylower, yupper), pixels, shapely.STRtree(pixels.ravel())
 
 
 def rectangle_to_n(
     center: tuple, width: float, thickness: float, x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4
 ) -> "np.ndarray":
 
+    # Pixel bounds
+    xlower, xupper, ylower, yupper = _pixel_bounds(x, y)
+
+    # Get overlapping area as the product of the overlaps in each direction
     xc, yc = center
-    vertices = [
-        (xc - width / 2, yc - thickness / 2),
-        (xc - width / 2, yc + thickness / 2),
-        (xc + width / 2, yc + thickness / 2),
-        (xc + width / 2, yc - thickness / 2),
-    ]
-    return vertices_to_n(vertices, x, y, subpixel, core_index, cladding_index)
+    overlap_x = np.minimum(xupper, xc + width / 2) - np.maximum(xlower, xc - width / 2)
+    overlap_y = np.minimum(yupper, yc + thickness / 2) - np.maximum(ylower, yc - thickness / 2)
+    overlapping_area = np.clip(overlap_x, 0, None) * np.clip(overlap_y, 0, None)
+
+    return _overlap_to_n(overlapping_area, xlower, xupper, ylower, yupper, subpixel, core_index, cladding_index)
 
 
 def circle_to_n(
     center: tuple, radius: float, x: list, y: list, subpixel=True, core_index=3.4, cladding_index=1.4
 ) -> "np.ndarray":
 
-    polygon = Point(*center).buffer(radius)
-    return polygon_to_n_2D(polygon, x, y, subpixel, core_index, cladding_index)
+    # Pixel bounds
+    xlower, xupper, ylower, yupper = _pixel_bounds(x, y)
+
+    # Distances from the center to the closest and farthest point of every pixel
+    closest, farthest = _circle_pixel_distances(center, xlower, xupper, ylower, yupper)
+
+    # Without subpixel a pixel is core if its closest point lies inside the circle
+    if not subpixel:
+        return np.where(closest < radius, core_index, cladding_index)
+
+    # Pixels entirely inside or outside the circle are filled directly
+    overlapping_area = np.where(farthest <= radius, (xupper - xlower) * (yupper - ylower), 0.0)
+
+    # Only the pixels on the edge of the circle need the analytic overlap
+    edge = (closest < radius) & (farthest > radius)
+    xl, xu, yl, yu = (np.broadcast_to(bound, edge.shape)[edge] for bound in (xlower, xupper, ylower, yupper))
+    overlapping_area[edge] = _circle_rect_area(center, radius, xl, xu, yl, yu)
+    return _overlap_to_n(overlapping_area, xlower, xupper, ylower, yupper, subpixel, core_index, cladding_index)
+
+
+def _circle_pixel_distances(
+    center: tuple, xlower: "np.ndarray", xupper: "np.ndarray", ylower: "np.ndarray", yupper: "np.ndarray"
+) -> tuple:
+    """Returns the distance from the center of a circle to the closest and to the farthest point of every pixel"""
+
+    xc, yc = center
+    closest_x = np.maximum(np.maximum(xlower - xc, xc - xupper), 0)
+    closest_y = np.maximum(np.maximum(ylower - yc, yc - yupper), 0)
+    farthest_x = np.maximum(np.abs(xlower - xc), np.abs(xupper - xc))
+    farthest_y = np.maximum(np.abs(ylower - yc), np.abs(yupper - yc))
+    return np.hypot(closest_x, closest_y), np.hypot(farthest_x, farthest_y)
+
+
+def _pixel_bounds(x: list, y: list) -> tuple:
+    """Returns the lower and upper bounds of every pixel in the grid, shaped to broadcast as (len(x) - 1, len(y) - 1)"""
+    x, y = (np.asarray(x), np.asarray(y))
+    return x[:-1, None], x[1:, None], y[None, :-1], y[None, 1:]
+
+
+def _overlap_to_n(
+    overlapping_area: "np.ndarray",
+    xlower: "np.ndarray",
+    xupper: "np.ndarray",
+    ylower: "np.ndarray",
+    yupper: "np.ndarray",
+    subpixel: bool,
+    core_index: float,
+    cladding_index: float,
+) -> "np.ndarray":
+    """Maps the core area overlapping every pixel to the effective index of that pixel"""
+
+    if subpixel:
+        total_area = (xupper - xlower) * (yupper - ylower)
+        fraction = np.clip(overlapping_area / total_area, 0, 1)
+        return fraction * core_index + (1 - fraction) * cladding_index
+
+    return np.where(overlapping_area > 0, core_index, cladding_index)
+
+
+def _quadrant_area(x: "np.ndarray", y: "np.ndarray", radius: float) -> "np.ndarray":
+    """Signed area of the disk of the given radius centered at the origin that lies inside the rectangle spanned by the origin and (x, y)"""
+
+    def integral(t):
+        # Closed form of the integral of sqrt(radius^2 - t^2) from 0 to t
+        return 0.5 * (t * np.sqrt(radius ** 2 - t ** 2) + radius ** 2 * np.arcsin(t / radius))
+
+    a = np.clip(np.abs(x), 0, radius)
+    b = np.clip(np.abs(y), 0, radius)
+    m = np.minimum(a, np.sqrt(radius ** 2 - b ** 2))
+    return np.sign(x) * np.sign(y) * (b * m + integral(a) - integral(m))
+
+
+def _circle_rect_area(
+    center: tuple, radius: float, xlower: "np.ndarray", xupper: "np.ndarray", ylower: "np.ndarray", yupper: "np.ndarray"
+) -> "np.ndarray":
+    """Returns the exact overlapping area between a circle and the axis aligned rectangles [xlower, xupper] x [ylower, yupper]"""
+
+    xc, yc = center
+    xl, xu, yl, yu = (xlower - xc, xupper - xc, ylower - yc, yupper - yc)
+    return (
+        _quadrant_area(xu, yu, radius)
+        - _quadrant_area(xl, yu, radius)
+        - _quadrant_area(xu, yl, radius)
+        + _quadrant_area(xl, yl, radius)
+    )
+
 
 def interp2d(x, y, xx, yy, f, sci=False):
 
@@ -18,12 +18,12 @@ def bragg_ann(args):
     width2 = args.width2  # Width of second core block
     thickness = args.thickness  # Thicnkess of the core
     modesolver = MSNeuralNetwork  # Which modesolver to use
-    t = []  # Array that holds the transmission coefficients for different wavelengths
+    t = np.empty(num_wavelengths)  # Array that holds the transmission coefficients for different wavelengths
 
     eme = EME(num_periods=num_periods)
     ann = ANN()
 
-    for wavelength in np.linspace(wl_lower, wl_upper, num_wavelengths):
+    for k, wavelength in enumerate(np.linspace(wl_lower, wl_upper, num_wavelengths)):
 
         eme.reset()
 
@@ -40,7 +40,7 @@ def bragg_ann(args):
 
         eme.propagate()  # propagate at given wavelength
 
-        t.append(np.abs((eme.s_parameters()))[0, 0, 1] ** 2)  # Grab the transmission coefficient
+        t[k] = np.abs((eme.s_parameters()))[0, 0, 1] ** 2  # Grab the transmission coefficient
 
     return t
 
@@ -18,14 +18,16 @@ def bragg_empy(args):
     width2 = args.width2  # Width of second core block
     thickness = args.thickness  # Thicnkess of the core
     modesolver = MSEMpy  # Which modesolver to use
-    t = []  # Array that holds the transmission coefficients for different wavelengths
+    t = np.empty(num_wavelengths)  # Array that holds the transmission coefficients for different wavelengths
 
     eme = EME(num_periods=num_periods)
 
-    for wavelength in np.linspace(wl_lower, wl_upper, num_wavelengths):
+    for k, wavelength in enumerate(np.linspace(wl_lower, wl_upper, num_wavelengths)):
 
         eme.reset()
 
+        # The mode solvers are rebuilt per wavelength since MSEMpy fixes its wavelength and the dispersive
+        # Si and SiO2 indices at construction
         mode_solver1 = modesolver(
             wavelength, width1, thickness, mesh=mesh, num_modes=num_modes
         )  # First half of bragg grating
@@ -39,7 +41,7 @@ def bragg_empy(args):
 
         eme.propagate()  # propagate at given wavelength
 
-        t.append(np.abs((eme.s_parameters()))[0, 0, num_modes] ** 2)  # Grab the transmission coefficient
+        t[k] = np.abs((eme.s_parameters()))[0, 0, num_modes] ** 2  # Grab the transmission coefficient
 
     return t
 
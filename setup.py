@@ -36,7 +36,7 @@ setup(
     long_description=long_description,
     packages=find_packages(exclude=("tests",)),
     install_requires=get_install_requires(),
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,109 @@
+from emepy.geometries import DynamicRect2D, EMpyGeometryParameters
+from emepy.tools import vertices_to_n
+import numpy as np
+import unittest
+
+# Geometry params
+params = EMpyGeometryParameters(
+    wavelength=1.55,
+    cladding_width=2.5,
+    cladding_thickness=2.5,
+    core_index=3.4,
+    cladding_index=1.4,
+    mesh=50,
+)
+
+
+def create_rect(symmetry: bool = False, subpixel: bool = True, mesh: int = 50):
+
+    # Dynamic rectangle with a non trivial design
+    rect_params = EMpyGeometryParameters(**{**vars(params), "mesh": mesh})
+    rect = DynamicRect2D(
+        params=rect_params,
+        width=0.5,
+        length=2,
+        num_params=15,
+        symmetry=symmetry,
+        subpixel=subpixel,
+        mesh_z=10,
+        output_width=0.8,
+    )
+    design = rect.get_design()
+    design[::2] += 0.1 * np.sin(3 * design[1::2]) * (1 if symmetry else np.sign(design[::2]))
+    rect.set_design(design)
+    return rect
+
+
+class TestDynamicRect2D(unittest.TestCase):
+    def test_n_cache_isolated(self):
+        print("Testing the index map cache is isolated from callers")
+
+        rect = create_rect()
+        expected = rect.get_n(rect.grid_x, None, rect.grid_z).copy()
+
+        # Modifying a returned map should not leak into later maps or layers
+        n = rect.get_n(rect.grid_x, None, rect.grid_z)
+        n[:] = 0
+        rect.set_design(rect.get_design())
+        self.assertTrue(np.array_equal(rect.get_n(rect.grid_x, None, rect.grid_z), expected))
+        for i, layer in enumerate(rect.layers):
+            self.assertTrue(np.array_equal(layer.mode_solver.epsfunc.profile, expected[:, i]))
+
+    def test_n_cache_settings(self):
+        print("Testing the index map cache follows the geometry settings")
+
+        rect = create_rect(subpixel=True)
+        subpixel_n = rect.get_n(rect.grid_x, None, rect.grid_z)
+
+        # Changing subpixel should not return the cached subpixel map
+        rect.subpixel = False
+        rect.set_design(rect.get_design())
+        n = rect.get_n(rect.grid_x, None, rect.grid_z)
+        self.assertFalse(np.array_equal(n, subpixel_n))
+        self.assertTrue(np.all(np.isin(n, [params.core_index, params.cladding_index])))
+
+        # Changing the core index should not return the cached map either
+        rect.params.core_index = 3.0
+        rect.set_design(rect.get_design())
+        n = rect.get_n(rect.grid_x, None, rect.grid_z)
+        self.assertTrue(np.all(np.isin(n, [3.0, params.cladding_index])))
+
+    def test_symmetry_mirroring(self):
+        print("Testing symmetric designs are mirrored correctly")
+
+        grid_y = np.linspace(-0.5, 0.5, 12)
+        for mesh in [50, 51]:
+            rect = create_rect(symmetry=True, mesh=mesh)
+
+            # Full, unmirrored rasterization of the same polygon
+            design = rect.get_design().reshape(-1, 2)
+            vertices = np.concatenate(
+                [rect.static_vertices_left, design, rect.static_vertices_right, design[::-1] * [-1, 1]]
+            )
+
+            # Own grid (cached), symmetric grids with odd and even pixel counts, a list grid, and an asymmetric grid
+            grids_x = [
+                rect.grid_x,
+                np.linspace(-1.25, 1.25, 33),
+                np.linspace(-1.25, 1.25, 34),
+                np.linspace(-1.25, 1.25, 33).tolist(),
+                np.linspace(-1, 1.25, 40),
+            ]
+            for grid_x in grids_x:
+                expected = vertices_to_n(vertices, grid_x, rect.grid_z, True, params.core_index, params.cladding_index)
+
+                # 2D
+                n = rect.get_n(grid_x, None, rect.grid_z)
+                self.assertEqual(n.shape, expected.shape)
+                self.assertTrue(np.allclose(n, expected, rtol=0, atol=1e-12))
+
+                # 3D
+                n = rect.get_n(grid_x, grid_y, rect.grid_z)
+                core = np.abs(0.5 * (grid_y[1:] + grid_y[:-1])) < rect.thickness / 2
+                expected_3D = np.where(core[None, :, None], expected[:, None, :], params.cladding_index)
+                self.assertEqual(n.shape, expected_3D.shape)
+                self.assertTrue(np.allclose(n, expected_3D, rtol=0, atol=1e-12))
+
+
+if __name__ == "__main__":
+    unittest.main()
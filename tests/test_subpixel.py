@@ -1,4 +1,5 @@
-from emepy import rectangle_to_n, circle_to_n
+from emepy import rectangle_to_n, circle_to_n, vertices_to_n
+from shapely.geometry import Polygon, box
 import numpy as np
 from matplotlib import pyplot as plt
 import unittest
@@ -83,6 +84,45 @@ class TestSubpixel(unittest.TestCase):
         # Compare the two
         self.assertTrue(np.sum(delta_no_subpixel) < np.sum(delta_subpixel))
 
+    def test_subpixel_circle_area(self):
+        print("Testing circular subpixel area")
+
+        # The subpixel fill of an exact circle should integrate to its area
+        n = circle_to_n(
+            center=center, radius=radius, x=x, y=y, subpixel=True, core_index=core_index, cladding_index=cladding_index
+        )
+        fraction = (n - cladding_index) / (core_index - cladding_index)
+        pixel_area = np.outer(np.diff(x), np.diff(y))
+        self.assertAlmostEqual(np.sum(fraction * pixel_area), np.pi * radius**2, places=10)
+
+    def test_subpixel_polygon(self):
+        print("Testing polygon subpixel")
+
+        # Non-convex star on a non-uniform grid
+        angles = np.linspace(0, 2 * np.pi, 10, endpoint=False)
+        radii = np.where(np.arange(10) % 2, 0.4, 1.2)
+        vertices = np.column_stack([radii * np.cos(angles) + 0.05, radii * np.sin(angles) - 0.1])
+        x_grid = 1.5 * np.sinh(np.linspace(-2, 2, 60)) / np.sinh(2)
+        y_grid = np.cbrt(np.linspace(-1.5, 1.5, 45)) * 1.5 / np.cbrt(1.5)
+
+        # Direct per pixel intersection
+        polygon = Polygon(vertices)
+        overlapping_area = np.zeros((len(x_grid) - 1, len(y_grid) - 1))
+        for i, (xl, xu) in enumerate(zip(x_grid[:-1], x_grid[1:])):
+            for j, (yl, yu) in enumerate(zip(y_grid[:-1], y_grid[1:])):
+                overlapping_area[i, j] = polygon.intersection(box(xl, yl, xu, yu)).area
+        fraction = overlapping_area / np.outer(np.diff(x_grid), np.diff(y_grid))
+
+        # With subpixel
+        n = vertices_to_n(vertices, x_grid, y_grid, True, core_index, cladding_index)
+        expected = fraction * core_index + (1 - fraction) * cladding_index
+        self.assertTrue(np.allclose(n, expected, rtol=0, atol=1e-12))
+
+        # Without subpixel
+        n = vertices_to_n(vertices, x_grid, y_grid, False, core_index, cladding_index)
+        expected = np.where(overlapping_area > 0, core_index, cladding_index)
+        self.assertTrue(np.array_equal(n, expected))
+
 
 if __name__ == "__main__":
     unittest.main()